@@ -1,12 +1,197 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from typing import Literal
 import psutil
 import os
 import platform
 import subprocess
 import socket
 import re
+import heapq
+import threading
+import time
+import json
+import gzip
+import inspect
+import functools
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
-app = FastAPI(title="CloudBot Agent API", version="1.0")
+# Optional fast encoders / compressors — fall back to stdlib when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ============================================================
+# 0️⃣ RESPONSE ENCODING (Accept / Accept-Encoding negotiation)
+# ============================================================
+COMPRESS_MIN_BYTES = int(os.getenv("CLOUDBOT_COMPRESS_MIN_BYTES", "1024"))
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Headers of the request being served, set by RequestHeadersMiddleware
+_request_headers = ContextVar("request_headers", default={})
+
+
+def _accepted(header: str):
+    """Parse an Accept/Accept-Encoding header into {value: q}."""
+    accepted = {}
+    for part in (header or "").split(","):
+        value, _, params = part.strip().partition(";")
+        q = 1.0
+        match = re.search(r"q=([^;,\s]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0  # malformed q-value: treat as not acceptable
+        if value:
+            accepted[value.strip().lower()] = q
+    return accepted
+
+
+def encode_json(payload) -> bytes:
+    if orjson:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def encode_msgpack(payload) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return gzip.compress(body, compresslevel=5)
+
+
+def negotiate(headers, payload):
+    """
+    Encode `payload` in the best format the client accepts and return
+    (body, media_type, extra_headers):
+    - MessagePack when it ranks above JSON in Accept (and msgpack is installed),
+      otherwise compact JSON via orjson (stdlib json as fallback). An explicitly
+      listed type beats the */* wildcard at equal q.
+    - zstd or gzip compression when the body exceeds COMPRESS_MIN_BYTES.
+    """
+    accept = _accepted(headers.get("accept"))
+    if not accept:
+        json_rank = (1.0, False)
+    elif "application/json" in accept:
+        json_rank = (accept["application/json"], True)
+    else:
+        json_rank = (accept.get("*/*", 0.0), False)
+    msgpack_q = max(accept.get(t, 0.0) for t in MSGPACK_TYPES)
+
+    if msgpack and msgpack_q > 0 and (msgpack_q, True) > json_rank:
+        body, media_type = encode_msgpack(payload), "application/msgpack"
+    else:
+        body, media_type = encode_json(payload), "application/json"
+
+    extra = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encodings = _accepted(headers.get("accept-encoding"))
+        if zstandard and encodings.get("zstd", 0) > 0:
+            encoding = "zstd"
+        elif encodings.get("gzip", 0) > 0:
+            encoding = "gzip"
+        else:
+            encoding = None
+        if encoding:
+            body = compress(body, encoding)
+            extra["Content-Encoding"] = encoding
+
+    return body, media_type, extra
+
+
+class NegotiatedResponse(Response):
+    """Encodes a plain payload per the current request's Accept headers."""
+
+    media_type = "application/json"
+
+    def __init__(self, content=None, status_code=200, headers=None, **kwargs):
+        body, media_type, extra = negotiate(_request_headers.get(), content)
+        super().__init__(
+            content=body,
+            status_code=status_code,
+            headers={**(headers or {}), **extra},
+            media_type=media_type,
+            background=kwargs.get("background"),
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sampler.start()
+    yield
+    sampler.stop()
+
+
+def _negotiated(endpoint):
+    """Wrap `endpoint` so plain results become a NegotiatedResponse."""
+
+    def respond(result):
+        return result if isinstance(result, Response) else NegotiatedResponse(result)
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return respond(await endpoint(*args, **kwargs))
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return respond(endpoint(*args, **kwargs))
+
+    return wrapper
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route class for the agent: handlers keep returning plain dicts, which are
+    handed to NegotiatedResponse as-is. Returning a Response makes FastAPI skip
+    its pure-Python jsonable_encoder pass, which would otherwise dominate the
+    encode cost (the payloads are already plain dicts/lists).
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _negotiated(endpoint), **kwargs)
+
+
+class RequestHeadersMiddleware:
+    """Pure ASGI middleware exposing the request headers to NegotiatedResponse."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _request_headers.set(Headers(scope=scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_headers.reset(token)
+
+
+app = FastAPI(title="CloudBot Agent API", version="1.0", lifespan=lifespan)
+app.router.route_class = NegotiatedRoute
+app.add_middleware(RequestHeadersMiddleware)
 
 
 # ============================================================
@@ -209,3 +394,166 @@ def get_security_signals():
         security_data["kernel_security_status"] = "unknown"
 
     return security_data
+
+# ============================================================
+# 6️⃣ TOP-N PROCESSES ENDPOINT
+# ============================================================
+class ProcessSampler:
+    """
+    Incremental process sampler:
+    - A background thread ticks every `interval` seconds, so CPU and I/O rates
+      are deltas over a short, bounded window and requests never sleep.
+    - Reuses psutil's cached Process objects across ticks (process_iter keeps
+      them keyed by pid and drops them when a pid is reused).
+    - Reads only the attributes it reports, in one oneshot() pass per process.
+    - Processes first seen in a tick are ranked by their lifetime average, so
+      a runaway process that just started is not missed.
+    """
+
+    ATTRS = ["pid", "name", "create_time", "cpu_times", "memory_info"]
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.with_io = hasattr(psutil.Process, "io_counters")
+        self._attrs = self.ATTRS + (["io_counters"] if self.with_io else [])
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_error = None
+        self._prev = {}  # (pid, create_time) -> (cpu_seconds, io_bytes)
+        self._rows = []
+        self._last_tick = None
+        self.stats = {"tick_ms": None, "processes": 0, "interval_s": None}
+
+    def tick(self):
+        start = time.perf_counter()
+        now, wall = time.monotonic(), time.time()
+        elapsed = now - self._last_tick if self._last_tick is not None else None
+
+        rows, current, io_unreadable = [], {}, 0
+        for proc in psutil.process_iter(self._attrs, ad_value=None):
+            info = proc.info
+            cpu_times, mem = info["cpu_times"], info["memory_info"]
+            if cpu_times is None or mem is None:
+                continue
+
+            create_time = info["create_time"]
+            cpu_seconds = cpu_times.user + cpu_times.system
+            io = info.get("io_counters")
+            io_bytes = io.read_bytes + io.write_bytes if io else None
+            if self.with_io and io is None:
+                io_unreadable += 1
+
+            cpu_percent = io_rate = None
+            # Without create_time there is neither pid-reuse detection nor a
+            # lifetime to average over, so such processes are only ranked by rss
+            if create_time is not None:
+                key = (info["pid"], create_time)
+                current[key] = (cpu_seconds, io_bytes)
+
+                prev = self._prev.get(key)
+                if prev and elapsed:
+                    window, prev_cpu, prev_io = elapsed, prev[0], prev[1]
+                else:
+                    # New since the last tick: average over the process lifetime
+                    window = max(wall - create_time, 0.01)
+                    prev_cpu, prev_io = 0.0, 0
+
+                cpu_percent = round((cpu_seconds - prev_cpu) / window * 100, 1)
+                if io_bytes is not None and prev_io is not None:
+                    io_rate = round((io_bytes - prev_io) / window)
+
+            rows.append(
+                {
+                    "pid": info["pid"],
+                    "name": info["name"],
+                    "cpu_percent": cpu_percent,
+                    "rss_mb": round(mem.rss / (1024**2), 1),
+                    "io_bytes_per_s": io_rate,
+                }
+            )
+
+        stats = {
+            "tick_ms": round((time.perf_counter() - start) * 1000, 2),
+            "processes": len(rows),
+            "interval_s": round(elapsed, 2) if elapsed else None,
+        }
+        if self.with_io:
+            # Other users' I/O counters are unreadable unless the agent is root
+            stats["io_unreadable"] = io_unreadable
+
+        # Only live processes are carried over, so exited pids fall out here
+        with self._lock:
+            self._prev = current
+            self._rows = rows
+            self._last_tick = now
+            self.stats = stats
+
+    def start(self):
+        """Take a first sample and keep ticking in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._sample()
+        self._thread = threading.Thread(
+            target=self._run, name="process-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        try:
+            self.tick()
+        except Exception as e:
+            # Log once per failure streak; the endpoint reports it via last_error
+            if self._last_error is None:
+                logging.exception("⚠️ Process sampler tick failed")
+            self._last_error = str(e)
+        else:
+            self._last_error = None
+
+    def top(self, by: str, n: int):
+        """Return the top `n` processes of the latest sample ranked by `by`."""
+        with self._lock:
+            rows, stats, last_tick = self._rows, dict(self.stats), self._last_tick
+        if self._last_error:
+            stats["last_error"] = self._last_error
+        if last_tick is not None:
+            stats["age_s"] = round(time.monotonic() - last_tick, 2)
+
+        field = {"cpu": "cpu_percent", "rss": "rss_mb", "io": "io_bytes_per_s"}[by]
+        top = heapq.nlargest(
+            n, (r for r in rows if r[field] is not None), key=lambda r: r[field]
+        )
+        return top, stats
+
+
+sampler = ProcessSampler(float(os.getenv("CLOUDBOT_PROC_SAMPLE_INTERVAL", "2")))
+
+
+@app.get("/processes/top")
+def get_top_processes(
+    by: Literal["cpu", "rss", "io"] = "cpu",
+    n: int = Query(10, ge=1, le=100),
+):
+    if by == "io" and not sampler.with_io:
+        return {"error": "Per-process I/O counters are not supported on this platform"}
+
+    processes, stats = sampler.top(by, n)
+    result = {"by": by, "n": n, "sampler": stats, "processes": processes}
+    if by == "io" and stats.get("io_unreadable"):
+        result["warning"] = (
+            f"Partial view: I/O counters of {stats['io_unreadable']} processes "
+            "are not readable by the agent user"
+        )
+    return result
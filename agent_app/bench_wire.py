@@ -0,0 +1,147 @@
+"""
+Wire-format benchmark for the CloudBot agent.
+
+For each endpoint of a running agent:
+- fetches it with the bot's real WIRE_HEADERS and with plain JSON and reports
+  the bytes actually received;
+- re-encodes the payload locally with every format/compression combination
+  the agent can negotiate and reports encode time, size and client-side
+  decode time (decompression + decode_response) against FastAPI's default
+  JSONResponse path. The other rows time the encoders bare, which is what the
+  agent runs: NegotiatedRoute skips FastAPI's jsonable_encoder pass.
+
+Usage:
+    python bench_wire.py [--base-url http://localhost:8000] [--repeat 200]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import requests
+from fastapi.encoders import jsonable_encoder
+
+from app import compress, encode_json, encode_msgpack, msgpack, orjson, zstandard
+
+# The client-side decoder lives with the bot
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "bot"))
+from wire import WIRE_HEADERS, decode_response  # noqa: E402
+
+ENDPOINTS = [
+    "/metrics",
+    "/logs",
+    "/system-inventory",
+    "/security",
+    "/processes/top?by=cpu&n=50",
+]
+
+
+class Body:
+    """Minimal stand-in for a requests.Response, as seen by decode_response."""
+
+    def __init__(self, content: bytes, content_type: str):
+        self.content = content
+        self.headers = {"Content-Type": content_type}
+
+
+def default_json(payload) -> bytes:
+    # FastAPI's default path: jsonable_encoder + JSONResponse.render
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(body)
+    return gzip.decompress(body)
+
+
+def wire_bytes(url: str, headers: dict):
+    """Fetch `url` and return (bytes on the wire, Content-Type, Content-Encoding)."""
+    res = requests.get(url, headers=headers, timeout=10)
+    res.raise_for_status()
+    size = int(res.headers.get("Content-Length", len(res.content)))
+    return size, res.headers.get("Content-Type"), res.headers.get("Content-Encoding")
+
+
+def timed(fn, arg, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(arg)
+    return (time.perf_counter() - start) / repeat * 1e6, out
+
+
+def variants():
+    """Yield (name, encoder, content_type, encoding) for every negotiable format."""
+    encoders = [("json (fastapi)", default_json, "application/json")]
+    fast_name = "json (orjson)" if orjson else "json (compact)"
+    encoders.append((fast_name, encode_json, "application/json"))
+    if msgpack:
+        encoders.append(("msgpack", encode_msgpack, "application/msgpack"))
+
+    for name, encoder, content_type in encoders:
+        yield name, encoder, content_type, None
+        for encoding in ["gzip"] + (["zstd"] if zstandard else []):
+            yield (
+                f"{name} + {encoding}",
+                lambda p, e=encoder, c=encoding: compress(e(p), c),
+                content_type,
+                encoding,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    plain = {"Accept": "application/json", "Accept-Encoding": "identity"}
+
+    for path in ENDPOINTS:
+        url = args.base_url + path
+        try:
+            res = requests.get(url, headers=plain, timeout=10)
+            res.raise_for_status()
+            payload = res.json()
+            plain_size, _, _ = wire_bytes(url, plain)
+            negotiated_size, content_type, encoding = wire_bytes(url, WIRE_HEADERS)
+        except Exception as e:
+            print(f"\n{path}: could not fetch ({e})")
+            continue
+
+        print(f"\n{path}")
+        print(
+            f"  on the wire: {plain_size} B plain JSON -> {negotiated_size} B with "
+            f"WIRE_HEADERS ({content_type}, {encoding or 'identity'}, "
+            f"{1 - negotiated_size / plain_size:.0%} saved)"
+        )
+        print(
+            f"  {'format':<24}{'encode µs':>12}{'decode µs':>12}"
+            f"{'bytes':>10}{'saved':>9}"
+        )
+        baseline_bytes = None
+        for name, encoder, content_type, encoding in variants():
+            encode_us, body = timed(encoder, payload, args.repeat)
+            decode_us, _ = timed(
+                lambda b: decode_response(
+                    Body(decompress(b, encoding) if encoding else b, content_type)
+                ),
+                body,
+                args.repeat,
+            )
+            if baseline_bytes is None:
+                baseline_bytes = len(body)
+            saved = 1 - len(body) / baseline_bytes
+            print(
+                f"  {name:<24}{encode_us:>12.1f}{decode_us:>12.1f}"
+                f"{len(body):>10}{saved:>9.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import requests
 from dotenv import load_dotenv
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
+from wire import WIRE_HEADERS, decode_response
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(page_title="🤖 CloudBot AI", layout="centered")
@@ -86,7 +87,7 @@ with st.sidebar:
     # Agents container
     agent_box = st.container()
     session = requests.Session()
-    session.headers.update({"User-Agent": "CloudBot/1.0"})
+    session.headers.update({"User-Agent": "CloudBot/1.0", **WIRE_HEADERS})
 
     with agent_box:
         if not agents:
@@ -114,7 +115,7 @@ with st.sidebar:
                     # metrics endpoint (optional)
                     metrics_res = session.get(base_url + "/metrics", timeout=3)
                     if metrics_res.ok:
-                        metrics = metrics_res.json()
+                        metrics = decode_response(metrics_res)
                         cpu_percent = metrics.get("cpu_percent", "N/A")
                         memory_percent = metrics.get("memory", {}).get("percent", "N/A")
                 except requests.RequestException:
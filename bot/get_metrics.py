@@ -1,5 +1,6 @@
 import requests
 import json
+from wire import WIRE_HEADERS, decode_response
 
 
 # === Load JSON file ===
@@ -31,47 +32,73 @@ def fetch_agent_data(agent_name: str, data_type: str):
         # Fetch metrics
         if data_type in ["metrics", "all"]:
             try:
-                res = requests.get(f"{base_url}/metrics", timeout=5)
+                res = requests.get(
+                    f"{base_url}/metrics", headers=WIRE_HEADERS, timeout=5
+                )
                 res.raise_for_status()
-                agent_result["metrics"] = res.json()
+                agent_result["metrics"] = decode_response(res)
             except Exception as e:
                 agent_result["metrics_error"] = str(e)
 
         # Fetch logs
         if data_type in ["logs", "all"]:
             try:
-                res = requests.get(f"{base_url}/logs", timeout=5)
+                res = requests.get(
+                    f"{base_url}/logs", headers=WIRE_HEADERS, timeout=5
+                )
                 res.raise_for_status()
-                agent_result["logs"] = res.json()
+                agent_result["logs"] = decode_response(res)
             except Exception as e:
                 agent_result["logs_error"] = str(e)
 
         if data_type in ["system-inventory", "all"]:
             try:
-                res = requests.get(f"{base_url}/system-inventory", timeout=5)
+                res = requests.get(
+                    f"{base_url}/system-inventory", headers=WIRE_HEADERS, timeout=5
+                )
                 res.raise_for_status()
-                agent_result["system-inventory"] = res.json()
+                agent_result["system-inventory"] = decode_response(res)
             except Exception as e:
                 agent_result["system-inventory_error"] = str(e)
 
         if data_type in ["security", "all"]:
             try:
-                res = requests.get(f"{base_url}/security", timeout=5)
+                res = requests.get(
+                    f"{base_url}/security", headers=WIRE_HEADERS, timeout=5
+                )
                 res.raise_for_status()
-                agent_result["security"] = res.json()
+                agent_result["security"] = decode_response(res)
             except Exception as e:
                 agent_result["security_error"] = str(e)
 
+        if data_type in ["processes", "all"]:
+            try:
+                agent_result["processes"] = fetch_top_processes(ip)
+            except Exception as e:
+                agent_result["processes_error"] = str(e)
+
         results[name] = agent_result
 
     return results
 
 
+def fetch_top_processes(ip: str, by: str = "cpu", n: int = 10):
+    """Fetch the agent's top-N processes ranked by cpu, rss or io."""
+    res = requests.get(
+        f"http://{ip}:8000/processes/top",
+        params={"by": by, "n": n},
+        headers=WIRE_HEADERS,
+        timeout=5,
+    )
+    res.raise_for_status()
+    return decode_response(res)
+
+
 # === MAIN ===
 if __name__ == "__main__":
     agent_name = input("Enter agent name (agent1, agent2, or all): ").strip()
     data_type = input(
-        "Enter data type (metrics, logs, system-inventory or all): "
+        "Enter data type (metrics, logs, system-inventory, processes or all): "
     ).strip()
 
     print(f"\n🔍 Fetching '{data_type}' from '{agent_name}'...\n")
@@ -0,0 +1,34 @@
+import json
+
+# Optional fast decoders — fall back to stdlib json when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Prefer MessagePack when we can decode it; agents fall back to JSON otherwise.
+# Accept-Encoding is left to requests, which already advertises gzip (and zstd
+# when urllib3 has zstandard available) and transparently decompresses it.
+WIRE_HEADERS = {
+    "Accept": (
+        "application/msgpack, application/json;q=0.9"
+        if msgpack
+        else "application/json"
+    )
+}
+
+
+def decode_response(res):
+    """Decode an agent response according to its Content-Type."""
+    content_type = res.headers.get("Content-Type", "")
+    if "msgpack" in content_type:
+        return msgpack.unpackb(res.content, raw=False)
+    if orjson:
+        return orjson.loads(res.content)
+    return json.loads(res.content)
@@ -1,8 +1,12 @@
 import json
 from llm import set_llm
-from get_metrics import fetch_agent_data
+from get_metrics import AGENTS, fetch_agent_data, fetch_top_processes
 import logging
 
+# Metrics above these thresholds pull in the agent's top processes
+CPU_ANOMALY_PERCENT = 80
+MEMORY_ANOMALY_PERCENT = 85
+
 
 class CloudBotOrchestrator:
     """
@@ -24,7 +28,7 @@ class CloudBotOrchestrator:
         to the function `fetch_agent_data(agent_name, data_type)`.
 
         Available agents: "cloudbot-agent-1", "cloudbot-agent-2", or "all"
-        Data types: "metrics", "logs", "system-inventory" , "security" or "all"
+        Data types: "metrics", "logs", "system-inventory" , "security", "processes" or "all"
 
         Respond **only** with a JSON object like this:
         {{
@@ -50,17 +54,48 @@ class CloudBotOrchestrator:
 
         return agent_name, data_type
 
+    def attach_process_view(self, results: dict):
+        """
+        For every agent whose metrics show a CPU or memory anomaly, add the
+        top processes (by cpu and/or rss) so the summary can explain *why*.
+        """
+        for name, agent_result in results.items():
+            metrics = agent_result.get("metrics")
+            if not metrics:
+                continue
+
+            checks = {
+                # data_type "processes"/"all" already fetched the CPU view
+                "cpu": metrics.get("cpu_percent", 0) >= CPU_ANOMALY_PERCENT
+                and "processes" not in agent_result,
+                "rss": metrics.get("memory", {}).get("percent", 0)
+                >= MEMORY_ANOMALY_PERCENT,
+            }
+            for by, anomalous in checks.items():
+                if not anomalous:
+                    continue
+                try:
+                    agent_result[f"top_processes_by_{by}"] = fetch_top_processes(
+                        AGENTS[name], by=by
+                    )
+                except Exception as e:
+                    agent_result[f"top_processes_by_{by}_error"] = str(e)
+
+        return results
+
     def handle_query(self, query: str):
         """
         Main orchestration logic:
         1. Use LLM to interpret what to fetch.
-        2. Fetch data from target agent(s).
+        2. Fetch data from target agent(s), adding top processes for agents
+           with CPU or memory anomalies.
         3. Ask the LLM to generate a Markdown-formatted response that can include
            summaries, insights, or direct data formatting — without assuming
            specific metric names.
         """
         agent_name, data_type = self.decide_parameters(query)
         results = fetch_agent_data(agent_name, data_type)
+        results = self.attach_process_view(results)
 
         # Generalized markdown prompt (no assumptions about content)
         summary_prompt = f"""